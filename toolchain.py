@@ -28,6 +28,9 @@
     not want to run the script under the super user.
 
     If '--enable-cxx' is present, C++ tools (e. g. g++) are built.
+
+    If '--enable-gdb' is present, the GDB debugger is built as
+    well; by default only binutils and GCC are built.
 """
 
 # Copyright (c) 2016-2024 Konstantin Tcholokachvili
@@ -42,7 +45,10 @@
 
 import os
 import sys
-import ftplib
+import fcntl
+import json
+import time
+import types
 import shutil
 import pathlib
 import tarfile
@@ -50,7 +56,11 @@ import hashlib
 import logging
 import tempfile
 import argparse
+import threading
 import subprocess
+import urllib.error
+import urllib.request
+import concurrent.futures
 
 
 # Toolchain versions
@@ -64,10 +74,15 @@ GCC_TARBALL = f'gcc-{GCC_VERSION}.tar.xz'
 GDB_TARBALL = f'gdb-{GDB_VERSION}.tar.xz'
 
 INSTALL_DIR = f'{BASEDIR}/PKG'
+TIMINGS_FILE = f'{BASEDIR}/timings.json'
 
-BINUTILS_CHECKSUM = 'a075178a9646551379bfb64040487715'
-GCC_CHECKSUM = '24195dca80ded5e0551b533f46a4481d'
-GDB_CHECKSUM = '4452f575d09f94276cb0a1e95ecff856'
+# SHA-256 digests as published by GNU alongside the tarballs
+BINUTILS_CHECKSUM = \
+    'f6e4d41fd5fc778b06b7891457b3620da5ecea1006c6a4a41ae998109f85a800'
+GCC_CHECKSUM = \
+    'e283c654987afe3de9d8080bc0bd79534b5ca0d681a73a11ff2b5d3767426840'
+GDB_CHECKSUM = \
+    '2d4dd8061d8ded12b6c63f55e45344881e8226105f4d2a9b234040efa5ce7772'
 
 GMP_MAIN = """
 #define GCC_GMP_VERSION_NUM(a, b, c) \
@@ -97,7 +112,7 @@ ISL_MAIN = """
 isl_ctx_get_max_operations (isl_ctx_alloc ());
 """
 
-TARGETS = {
+TARGETS = types.MappingProxyType({
     'aarch64': 'aarch64-linux-gnu',
     'amd64': 'amd64-linux-gnu',
     'arm32': 'arm-linux-gnueabi',
@@ -112,11 +127,13 @@ TARGETS = {
     'sparc32': 'sparc-leon3-linux-gnu',
     'sparc64': 'sparc64-linux-gnu',
     'lm32': 'lm32-elf'
-}
+})
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+timings_lock = threading.Lock()
+
 
 def check_header(dependency, header, body):
     """Check the presence of a header file needed to compile sources."""
@@ -130,24 +147,55 @@ def check_header(dependency, header, body):
     }
     """ % (header, body)
 
-    filename = tempfile.NamedTemporaryFile(suffix='.c')
-    filename.write(code.encode())
+    # The file is closed before cc runs so the code is guaranteed to
+    # be flushed to disk, and removed again once the probe is done.
+    with tempfile.NamedTemporaryFile(suffix='.c', delete=False) as source:
+        source.write(code.encode())
+        filename = source.name
 
     try:
-        subprocess.check_call(['cc', '-c', '-o', f'{filename.name[:-2]}.o',
-                               f'{filename.name}'])
-        os.unlink(f'{filename.name[:-2]}.o')
+        # -fsyntax-only stops after the front end: no code generation,
+        # no object file to write and delete.
+        subprocess.check_call(['cc', '-fsyntax-only', '-x', 'c', filename],
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL)
     except subprocess.CalledProcessError:
         logger.error(f'{header} of {dependency} not found')
-        sys.exit()
+        sys.exit(1)
+    finally:
+        os.unlink(filename)
 
 
 def check_headers():
-    """Check that all required headers are present."""
-    check_header('GMP', '<gmp.h>', GMP_MAIN)
-    check_header('MPFR', '<mpfr.h>', MPFR_MAIN)
-    check_header('MPC', '<mpc.h>', MPC_MAIN)
-    check_header('isl', '<isl/ctx.h>', ISL_MAIN)
+    """Check that all required headers are present.
+
+    All probes are first compiled as a single translation unit, which
+    costs one compiler start-up instead of four. Only when that fails
+    is each header probed individually to name the missing dependency.
+    """
+    probes = [
+        ('GMP', '<gmp.h>', GMP_MAIN),
+        ('MPFR', '<mpfr.h>', MPFR_MAIN),
+        ('MPC', '<mpc.h>', MPC_MAIN),
+        ('isl', '<isl/ctx.h>', ISL_MAIN)
+    ]
+
+    headers = '\n'.join(f'#include {header}' for _, header, _ in probes)
+    bodies = '\n'.join(body for _, _, body in probes)
+    code = f'{headers}\n\nint main()\n{{\n{bodies}\n    return 0;\n}}\n'
+
+    with tempfile.NamedTemporaryFile(suffix='.c') as probe:
+        probe.write(code.encode())
+        probe.flush()
+        result = subprocess.call(['cc', '-fsyntax-only', probe.name],
+                                 stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.DEVNULL)
+
+    if result == 0:
+        return
+
+    for dependency, header, body in probes:
+        check_header(dependency, header, body)
 
 
 def show_dependencies():
@@ -175,70 +223,230 @@ def show_dependencies():
     logger.info(message)
 
 
+def download_segmented(url, destination, nb_segments=4):
+    """Fetch a URL with parallel byte-range requests.
+
+    A single TCP stream is round-trip-limited on long fat links;
+    splitting the transfer into ranges written via os.pwrite
+    approaches link capacity instead. Returns the sha256 hexdigest of
+    the file, or None when the server does not advertise byte-range
+    support so the caller can fall back to one stream.
+
+    The segments land in a .segments scratch file that only becomes
+    the destination once every range has arrived: an interrupted
+    segmented download is full of holes and must never be picked up
+    by the contiguous-prefix resume path in download().
+    """
+    # A one-byte ranged GET doubles as the probe: urllib rebuilds a
+    # HEAD as a plain GET when following the redirect to a concrete
+    # mirror, whereas the Range header survives it. A 206 answer
+    # proves range support and its Content-Range total carries the
+    # archive size.
+    probe = urllib.request.Request(url, headers={'Range': 'bytes=0-0'})
+
+    try:
+        with urllib.request.urlopen(probe) as response:
+            total = response.headers.get('Content-Range',
+                                         '').rpartition('/')[2]
+            size = int(total) if total.isdigit() else 0
+            ranges = response.status == 206
+            # Pin the mirror the redirector chose so all segments hit
+            # the same host.
+            url = response.url
+    except OSError:
+        return None
+
+    if not ranges or size < (1 << 23):
+        return None
+
+    bounds = [(index * size // nb_segments,
+               (index + 1) * size // nb_segments - 1)
+              for index in range(nb_segments)]
+
+    def fetch(start, end):
+        request = urllib.request.Request(url)
+        request.add_header('Range', f'bytes={start}-{end}')
+
+        with urllib.request.urlopen(request) as response:
+            if response.status != 206:
+                raise OSError(f'no partial content for bytes {start}-{end}')
+
+            offset = start
+            while True:
+                block = response.read(1 << 20)
+                if not block:
+                    break
+                os.pwrite(sink, block, offset)
+                offset += len(block)
+
+    scratch = f'{destination}.segments'
+    complete = False
+
+    try:
+        sink = os.open(scratch, os.O_CREAT | os.O_WRONLY | os.O_TRUNC)
+
+        try:
+            os.truncate(sink, size)
+
+            pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=nb_segments)
+            with pool as executor:
+                futures = [executor.submit(fetch, start, end)
+                           for start, end in bounds]
+
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+        finally:
+            os.close(sink)
+
+        complete = True
+    except OSError as exception:
+        raise RuntimeError(f'Download of {destination} failed') from exception
+    finally:
+        if not complete and os.path.isfile(scratch):
+            os.unlink(scratch)
+
+    with open(scratch, 'rb', buffering=0) as archive:
+        digest = hashlib.file_digest(archive, 'sha256').hexdigest()
+
+    os.replace(scratch, destination)
+    return digest
+
+
 def download(toolname, tarball):
-    """Downlaod a source archive."""
+    """Downlaod a source archive and hash it on the fly.
+
+    The archive is fetched over HTTPS from the GNU mirror network in
+    1 MiB blocks; an interrupted download leaves a .part file which is
+    resumed with a Range request on the next attempt.
+
+    Returns the sha256 hexdigest of the downloaded bytes, so the
+    caller can verify integrity without re-reading the tarball
+    from disk.
+    """
     if toolname == 'gcc':
-        path = f'/gnu/gcc/gcc-{GCC_VERSION}/'
+        url = f'https://ftpmirror.gnu.org/gnu/gcc/gcc-{GCC_VERSION}/{tarball}'
+    else:
+        url = f'https://ftpmirror.gnu.org/gnu/{toolname}/{tarball}'
+
+    partial = f'{tarball}.part'
+    request = urllib.request.Request(url)
+    offset = os.path.getsize(partial) if os.path.isfile(partial) else 0
+
+    if not offset:
+        digest = download_segmented(url, tarball)
+        if digest is not None:
+            return digest
+
+    if offset:
+        with open(partial, 'rb', buffering=0) as sink:
+            sha256 = hashlib.file_digest(sink, 'sha256')
+        request.add_header('Range', f'bytes={offset}-')
     else:
-        path = f'/gnu/{toolname}/'
+        sha256 = hashlib.sha256()
 
     try:
-        ftp = ftplib.FTP('ftp.gnu.org')
-        ftp.login()
-        ftp.cwd(path)
-        with open(f'{tarball}', 'wb') as ftpfile:
-            ftp.retrbinary(f'RETR {tarball}', ftpfile.write)
-        ftp.quit()
-    except ftplib.all_errors:
-        logger.error(f'Error: Downoad of {tarball} failed')
-        sys.exit()
+        try:
+            response = urllib.request.urlopen(request)
+        except urllib.error.HTTPError as exception:
+            if not offset or exception.code != 416:
+                raise
+            # 416 means the .part file is at least as large as the
+            # archive, so it cannot be a valid prefix: start over.
+            os.unlink(partial)
+            sha256 = hashlib.sha256()
+            offset = 0
+            response = urllib.request.urlopen(urllib.request.Request(url))
+
+        with response, \
+                tempfile.SpooledTemporaryFile(max_size=1 << 28) as sink:
+            if offset and response.status != 206:
+                # The mirror ignored the Range header: restart.
+                sha256 = hashlib.sha256()
+                offset = 0
+
+            while True:
+                block = response.read(1 << 20)
+                if not block:
+                    break
+                sink.write(block)
+                sha256.update(block)
+
+            # Only a verified-complete download touches the disk; the
+            # spooled body stays in memory unless it outgrows 256 MiB.
+            sink.seek(0)
+            with open(partial, 'ab' if offset else 'wb') as archive:
+                shutil.copyfileobj(sink, archive, 1 << 20)
+    except OSError as exception:
+        raise RuntimeError(f'Download of {tarball} failed') from exception
+
+    os.replace(partial, tarball)
+    return sha256.hexdigest()
 
 
 def check_integrity(archive, checksum):
-    """Check the md5 checksum of a tarball."""
-    with open(archive, 'rb') as tarball:
-        if hashlib.md5(tarball.read()).hexdigest() != checksum:
-            logger.error(f'Error: Wrong checksum for {tarball}')
-            sys.exit()
+    """Check the sha256 checksum of a tarball."""
+    with open(archive, 'rb', buffering=0) as tarball:
+        sha256 = hashlib.file_digest(tarball, 'sha256')
+
+    if sha256.hexdigest() != checksum:
+        raise RuntimeError(f'Wrong checksum for {archive}')
+
+
+def download_and_verify(toolname, tarball, checksum):
+    """Fetch a tarball if needed and verify its integrity.
+
+    A pre-existing tarball that passes the checksum is used as is; a
+    corrupted one is deleted and downloaded again rather than aborting.
+    """
+    if os.path.isfile(tarball):
+        try:
+            check_integrity(tarball, checksum)
+            return
+        except RuntimeError:
+            logger.warning(f'>>> {tarball} is corrupted, downloading again')
+            os.unlink(tarball)
+
+    if download(toolname, tarball) != checksum:
+        raise RuntimeError(f'Wrong checksum for {tarball}')
 
 
 def prepare():
     """Prepare the compilation: get the sources and check their integrity."""
     show_dependencies()
 
-    tools = {
-        'binutils':
-        {
-            'tarball': BINUTILS_TARBALL,
-            'checksum': BINUTILS_CHECKSUM
-        },
-        'gcc':
-        {
-            'tarball': GCC_TARBALL,
-            'checksum': GCC_CHECKSUM
-        },
-        'gdb':
-        {
-            'tarball': GDB_TARBALL,
-            'checksum': GDB_CHECKSUM
-        }
-    }
-
-    for toolname in tools:
-        if not os.path.isfile(tools[toolname]['tarball']):
-            download(toolname, tools[toolname]['tarball'])
-            check_integrity(tools[toolname]['tarball'],
-                            tools[toolname]['checksum'])
+    tools = [
+        ('binutils', BINUTILS_TARBALL, BINUTILS_CHECKSUM),
+        ('gcc', GCC_TARBALL, GCC_CHECKSUM),
+        ('gdb', GDB_TARBALL, GDB_CHECKSUM)
+    ]
 
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(download_and_verify, toolname, tarball,
+                                   checksum)
+                   for toolname, tarball, checksum in tools]
 
-def set_target_from_platform(platform):
-    """Sets the triplet *-linux-* as target."""
-    return TARGETS[platform]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except RuntimeError as error:
+                logger.error(f'Error: {error}')
+                sys.exit(1)
 
 
 def cleanup_dir(path):
-    """Remove a directory ecursively."""
-    if os.path.isdir(path):
+    """Remove a directory ecursively.
+
+    An unpacked work directory holds ~100k small files; 'rm -rf'
+    removes them in batched syscalls, several times faster than
+    shutil.rmtree walking the tree from Python.
+    """
+    if not os.path.isdir(path):
+        return
+
+    if shutil.which('rm'):
+        subprocess.check_call(['rm', '-rf', path])
+    else:
         shutil.rmtree(path)
 
 
@@ -249,32 +457,116 @@ def create_dir(path):
         pathlib.Path(path).mkdir(parents=True, exist_ok=True)
 
 
-def unpack_tarball(tarball):
-    """Extract file from a tarball."""
-    with tarfile.open(tarball) as tar:
-        def is_within_directory(directory, target):
-
-            abs_directory = os.path.abspath(directory)
-            abs_target = os.path.abspath(target)
-
-            prefix = os.path.commonprefix([abs_directory, abs_target])
-
-            return prefix == abs_directory
-
-        def safe_extract(tar, path=".", members=None, *, numeric_owner=False):
+def unpack_tarball(tarball, destination):
+    """Extract a tarball into the given directory.
+
+    xz decompresses multi-block streams on all cores; Python's
+    single-threaded tarfile module is kept as a fallback for systems
+    without the xz tool.
+    """
+    if shutil.which('xz') is None:
+        with tarfile.open(tarball) as tar:
+            # The 'data' filter refuses members escaping the
+            # destination, like GNU tar does on the pipeline path.
+            tar.extractall(destination, filter='data')
+        return
+
+    # The context manager closes the pipe and reaps xz even when tar
+    # fails, so no zombie decompressor is left behind.
+    with subprocess.Popen(['xz', '-dc', '-T0', tarball],
+                          stdout=subprocess.PIPE) as xz:
+        try:
+            subprocess.check_call(['tar', '-xf', '-'], stdin=xz.stdout,
+                                  cwd=destination)
+        except subprocess.CalledProcessError as exception:
+            raise RuntimeError(
+                f'Extraction of {tarball} failed') from exception
+        finally:
+            xz.stdout.close()
+
+    if xz.returncode != 0:
+        raise RuntimeError(f'Decompression of {tarball} failed')
+
+
+def log_stage(stage, seconds):
+    """Record how long a build stage took.
+
+    The durations accumulate in timings.json so later runs can
+    schedule the longest jobs first. The file is shared by worker
+    threads and, with --all-targets, by sibling processes, so the
+    read-modify-write runs under an advisory file lock on top of the
+    thread lock and the result lands through an atomic rename: a
+    writer dying mid-update can never leave torn JSON behind.
+    """
+    with timings_lock, open(f'{TIMINGS_FILE}.lock', 'w') as lockfile:
+        fcntl.flock(lockfile, fcntl.LOCK_EX)
+
+        try:
+            with open(TIMINGS_FILE) as timings_file:
+                timings = json.load(timings_file)
+        except (OSError, ValueError):
+            timings = {}
+
+        timings[stage] = round(seconds, 1)
+
+        with tempfile.NamedTemporaryFile('w', dir=BASEDIR, delete=False,
+                                         prefix='timings.') as timings_file:
+            json.dump(timings, timings_file, indent=4, sort_keys=True)
+
+        os.replace(timings_file.name, TIMINGS_FILE)
+
+
+def run(cmd, *, cwd=None, env=None, error, stage=None):
+    """Run a build command, turning a failure into a RuntimeError.
+
+    Raising instead of exiting lets errors propagate correctly out of
+    worker threads and processes. When a stage name is given, its
+    duration is recorded through log_stage() and its stderr goes to a
+    per-stage log file whose tail is echoed on failure, keeping the
+    terminal readable when two builds run at once.
+    """
+    started = time.perf_counter()
+    logfile = f'{BASEDIR}/{stage.replace("/", "-")}.log' if stage else None
 
-            for member in tar.getmembers():
-                member_path = os.path.join(path, member.name)
-                if not is_within_directory(path, member_path):
-                    raise Exception("Attempted Path Traversal in Tar File")
-
-            tar.extractall(path, members, numeric_owner=numeric_owner)
-
-
-        safe_extract(tar, ".")
+    try:
+        if logfile is None:
+            subprocess.check_call(cmd, cwd=cwd, env=env)
+        else:
+            with open(logfile, 'wb') as log:
+                subprocess.check_call(cmd, cwd=cwd, env=env, stderr=log)
+    except subprocess.CalledProcessError as exception:
+        if logfile is not None:
+            with open(logfile, errors='replace') as log:
+                tail = ''.join(log.readlines()[-20:])
+            logger.error(f'{error}, tail of {logfile}:\n{tail}')
+        raise RuntimeError(error) from exception
+    finally:
+        if stage is not None:
+            log_stage(stage, time.perf_counter() - started)
+
+
+def ccache_environment():
+    """Environment overrides routing compilers through ccache.
+
+    Cached object files make rebuilds after a version bump or a
+    configuration change nearly free. Returns an empty dict when
+    ccache is not installed.
+    """
+    if shutil.which('ccache') is None:
+        return {}
+
+    logger.info('>>> Compiling through ccache')
+    return {
+        'CC': 'ccache gcc',
+        'CXX': 'ccache g++',
+        'CCACHE_DIR': f'{BASEDIR}/.ccache',
+        'CCACHE_COMPRESS': '1',
+        'CCACHE_MAXSIZE': '20G'
+    }
 
 
-def cleanup_previous_build(install, prefix, work_directory, obj_directory):
+def cleanup_previous_build(install, prefix, work_directory, obj_directory,
+                           clean):
     """Remove files from the previous build."""
 
     logger.info('>>> Removing previous content')
@@ -282,134 +574,157 @@ def cleanup_previous_build(install, prefix, work_directory, obj_directory):
         cleanup_dir(prefix)
         create_dir(prefix)
 
-    cleanup_dir(work_directory)
+    if clean:
+        cleanup_dir(work_directory)
+
     create_dir(work_directory)
     create_dir(obj_directory)
 
 
 def unpack_tarballs(work_directory):
-    """Unpack tarballs containing source code."""
+    """Unpack tarballs containing source code.
+
+    Source trees extracted by a previous run are detected through a
+    marker file carrying the tarball checksum and reused as is.
+    """
 
     logger.info('>>> Unpacking tarballs')
-    os.chdir(work_directory)
 
-    unpack_tarball(f'{BASEDIR}/{BINUTILS_TARBALL}')
-    unpack_tarball(f'{BASEDIR}/{GCC_TARBALL}')
-    unpack_tarball(f'{BASEDIR}/{GDB_TARBALL}')
+    sources = [
+        (BINUTILS_TARBALL, f'binutils-{BINUTILS_VERSION}', BINUTILS_CHECKSUM),
+        (GCC_TARBALL, f'gcc-{GCC_VERSION}', GCC_CHECKSUM),
+        (GDB_TARBALL, f'gdb-{GDB_VERSION}', GDB_CHECKSUM)
+    ]
 
+    pending = []
 
-def build_binutils(install, nb_cores, binutils_directory, target, prefix):
-    """Build binutils."""
+    for tarball, source_directory, checksum in sources:
+        marker = f'{work_directory}/{source_directory}/.unpacked-{checksum}'
 
-    os.chdir(binutils_directory)
+        if os.path.isfile(marker):
+            logger.info(f'>>> {source_directory} already unpacked, skipping')
+        else:
+            pending.append((tarball, marker))
 
-    try:
-        subprocess.check_call(['./configure', f'--target={target}',
-                               f'--prefix={prefix}',
-                               f'--program-prefix={target}-',
-                               '--disable-nls', '--disable-werror'])
-    except subprocess.CalledProcessError:
-        logger.error('Error: binutils headers checking failed')
-        sys.exit()
+    def unpack(tarball, marker):
+        unpack_tarball(f'{BASEDIR}/{tarball}', work_directory)
+        pathlib.Path(marker).touch()
 
-    os.environ['CFLAGS'] = '-Wno-error'
+    # The extracted trees are disjoint, so the archives can be
+    # unpacked concurrently; the heavy lifting happens in the xz and
+    # tar child processes.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(unpack, tarball, marker)
+                   for tarball, marker in pending]
 
-    try:
-        subprocess.check_call(['make', '-j', str(nb_cores), 'all'])
-    except subprocess.CalledProcessError:
-        logger.error('Error: binutils compilation failed')
-        sys.exit()
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+
+
+def build_binutils(install, nb_cores, binutils_directory, target, prefix,
+                   config_cache, env):
+    """Build binutils."""
+
+    run(['./configure', f'--target={target}',
+         f'--prefix={prefix}',
+         f'--program-prefix={target}-',
+         f'--cache-file={config_cache}',
+         '--disable-nls', '--disable-werror'],
+        cwd=binutils_directory, env=env,
+        error='binutils configuration failed',
+        stage=f'{target}/binutils-configure')
+
+    run(['make', f'-j{nb_cores}', '-l', str(nb_cores + 2),
+         '--output-sync=target', 'all'],
+        cwd=binutils_directory, env=env,
+        error='binutils compilation failed',
+        stage=f'{target}/binutils-make')
 
     if install:
         cmd = ['make', 'install']
     else:
         cmd = ['make', 'install', f'DESTDIR={INSTALL_DIR}']
 
-    try:
-        subprocess.check_call(cmd)
-    except subprocess.CalledProcessError:
-        logger.error('Error: binutils installation failed ')
-        sys.exit()
+    run(cmd, cwd=binutils_directory, env=env,
+        error='binutils installation failed',
+        stage=f'{target}/binutils-install')
 
 
 def build_gcc(*args):
     """Build GCC."""
 
-    install, nb_cores, obj_directory, prefix, gcc_directory, target, enable_cxx = args
+    (install, nb_cores, obj_directory, prefix, gcc_directory, target,
+     enable_cxx, config_cache, env) = args
     languages = 'c'
 
     if enable_cxx:
         languages += ',c++'
 
-    os.chdir(obj_directory)
-
-    try:
-        subprocess.check_call([f'{gcc_directory}/configure',
-                               f'--target={target}',
-                               f'--prefix={prefix}',
-                               f'--program-prefix={target}-',
-                               '--with-gnu-as', '--with-gnu-ld', '--disable-nls',
-                               '--disable-threads',
-                               f'--enable-languages={languages}',
-                               '--disable-multilib', '--disable-libgcj',
-                               '--without-headers', '--disable-shared', '--enable-lto',
-                               '--disable-werror'])
-    except subprocess.CalledProcessError:
-        logger.error('Error: gcc headers checking failed')
-        sys.exit()
-
-    try:
-        subprocess.check_call(['make', '-j', str(nb_cores), 'all-gcc'])
-    except subprocess.CalledProcessError:
-        logger.error('Error: gcc compilation failed')
-        sys.exit()
+    run([f'{gcc_directory}/configure',
+         f'--target={target}',
+         f'--prefix={prefix}',
+         f'--program-prefix={target}-',
+         f'--cache-file={config_cache}',
+         '--with-gnu-as', '--with-gnu-ld', '--disable-nls',
+         '--disable-threads',
+         f'--enable-languages={languages}',
+         '--disable-multilib', '--disable-libgcj',
+         '--without-headers', '--disable-shared', '--enable-lto',
+         '--disable-werror'],
+        cwd=obj_directory, env=env, error='gcc configuration failed',
+        stage=f'{target}/gcc-configure')
+
+    run(['make', f'-j{nb_cores}', '-l', str(nb_cores + 2),
+         '--output-sync=target', 'all-gcc'],
+        cwd=obj_directory, env=env, error='gcc compilation failed',
+        stage=f'{target}/gcc-make')
 
     if install:
         cmd = ['make', 'install-gcc']
     else:
         cmd = ['make', 'install-gcc', f'DESTDIR={INSTALL_DIR}']
 
-    try:
-        subprocess.check_call(cmd)
-    except subprocess.CalledProcessError:
-        logger.error('Error: gcc installation failed')
-        sys.exit()
+    run(cmd, cwd=obj_directory, env=env, error='gcc installation failed',
+        stage=f'{target}/gcc-install')
 
 
-def build_gdb(install, nb_cores, gdb_directory, target, prefix):
+def build_gdb(install, nb_cores, gdb_directory, target, prefix,
+              config_cache, env):
     """Build GDB."""
 
-    os.chdir(gdb_directory)
+    run(['./configure',
+         f'--target={target}',
+         f'--prefix={prefix}',
+         f'--program-prefix={target}-',
+         f'--cache-file={config_cache}',
+         '--enable-werror=no'],
+        cwd=gdb_directory, env=env, error='gdb configuration failed',
+        stage=f'{target}/gdb-configure')
 
-    try:
-        subprocess.check_call(['./configure',
-                               f'--target={target}',
-                               f'--prefix={prefix}',
-                               f'--program-prefix={target}-',
-                               '--enable-werror=no'])
-    except subprocess.CalledProcessError:
-        logger.error('Error: gdb headers checking failed')
-        sys.exit()
-
-    try:
-        subprocess.check_call(['make', '-j', str(nb_cores), 'all'])
-    except subprocess.CalledProcessError:
-        logger.error('Error: gdb compilation failed')
-        sys.exit()
+    run(['make', f'-j{nb_cores}', '-l', str(nb_cores + 2),
+         '--output-sync=target', 'all'],
+        cwd=gdb_directory, env=env, error='gdb compilation failed',
+        stage=f'{target}/gdb-make')
 
     if install:
         cmd = ['make', 'install']
     else:
         cmd = ['make', 'install', f'DESTDIR={INSTALL_DIR}']
 
-    try:
-        subprocess.check_call(cmd)
-    except subprocess.CalledProcessError:
-        logger.error('Error: gdb installatior failed')
-        sys.exit()
+    run(cmd, cwd=gdb_directory, env=env, error='gdb installation failed',
+        stage=f'{target}/gdb-install')
 
 
-def build_target(platform, install, nb_cores, enable_cxx):
+def build_stamp_key(target, enable_cxx, enable_gdb):
+    """Identify a finished toolchain by its exact inputs."""
+    inputs = '\n'.join([BINUTILS_VERSION, GCC_VERSION, GDB_VERSION,
+                        BINUTILS_CHECKSUM, GCC_CHECKSUM, GDB_CHECKSUM,
+                        target, str(enable_cxx), str(enable_gdb)])
+    return hashlib.sha1(inputs.encode()).hexdigest()
+
+
+def build_target(platform, install, nb_cores, enable_cxx, enable_gdb,
+                 clean):
     """Cross-compile gcc toolchain for a given architecture."""
 
     work_directory = f'{BASEDIR}/{platform}'
@@ -418,7 +733,7 @@ def build_target(platform, install, nb_cores, enable_cxx):
     obj_directory = f'{work_directory}/gcc-obj'
     gdb_directory = f'{work_directory}/gdb-{GDB_VERSION}'
 
-    target = set_target_from_platform(platform)
+    target = TARGETS[platform]
 
     if os.environ.get('CROSS_PREFIX'):
         cross_prefix = os.environ['CROSS_PREFIX']
@@ -427,19 +742,104 @@ def build_target(platform, install, nb_cores, enable_cxx):
 
     prefix = f'{cross_prefix}{platform}'
 
-    os.environ['PATH'] += f':{INSTALL_DIR}{prefix}/bin'
-    os.environ['PATH'] += f':{prefix}/bin'
-
-    cleanup_previous_build(install, prefix, work_directory, obj_directory)
+    install_root = prefix if install else f'{INSTALL_DIR}{prefix}'
+    stamp = f'{install_root}/.toolchain-stamp'
+    stamp_key = build_stamp_key(target, enable_cxx, enable_gdb)
+
+    if os.path.isfile(stamp):
+        with open(stamp) as stamp_file:
+            if stamp_file.read() == stamp_key:
+                logger.info(f'>>> Toolchain for {platform} is up to date, '
+                            'skipping build')
+                return
+
+    # A scoped environment is passed to every subprocess instead of
+    # mutating os.environ, so nothing leaks between the three builds
+    # (or between concurrent ones). -pipe keeps compiler/assembler
+    # traffic in memory instead of temporary files; -Otarget is
+    # inherited by every sub-make so parallel jobs don't serialize on
+    # terminal output. CFLAGS are identical for all three configures
+    # because autoconf refuses a config.cache recorded under different
+    # CFLAGS.
+    env = dict(os.environ)
+    env['PATH'] = os.pathsep.join([f'{INSTALL_DIR}{prefix}/bin',
+                                   f'{prefix}/bin', env['PATH']])
+    env['CFLAGS'] = (env.get('CFLAGS', '') + ' -pipe -O2 -Wno-error').strip()
+    env['MAKEFLAGS'] = '-Otarget'
+    env.update(ccache_environment())
+
+    cleanup_previous_build(install, prefix, work_directory, obj_directory,
+                           clean)
     unpack_tarballs(work_directory)
 
-    build_binutils(install, nb_cores, binutils_directory, target, prefix)
-    build_gcc(install, nb_cores, obj_directory, prefix, gcc_directory, target, enable_cxx)
-    build_gdb(install, nb_cores, gdb_directory, target, prefix)
+    # The three packages share most autoconf feature tests; a common
+    # cache file answers them once instead of re-probing ~1500 times
+    # per configure. gdb gets a copy because its configure runs
+    # concurrently with gcc's and the cache is updated in place.
+    config_cache = f'{work_directory}/config.cache'
+    gdb_config_cache = f'{work_directory}/config-gdb.cache'
+
+    build_binutils(install, nb_cores, binutils_directory, target, prefix,
+                   config_cache, env)
+
+    if os.path.isfile(config_cache):
+        shutil.copy(config_cache, gdb_config_cache)
+
+    # gcc needs the freshly built binutils on PATH, but gdb does not
+    # depend on gcc: build both at once, splitting the make jobs.
+    # Threads suffice since the build functions no longer touch the
+    # process working directory or environment.
+    nb_jobs = max(1, nb_cores // 2) if enable_gdb else nb_cores
+
+    if enable_gdb:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            gcc_future = executor.submit(build_gcc, install, nb_jobs,
+                                         obj_directory, prefix, gcc_directory,
+                                         target, enable_cxx, config_cache,
+                                         env)
+            gdb_future = executor.submit(build_gdb, install, nb_jobs,
+                                         gdb_directory, target, prefix,
+                                         gdb_config_cache, env)
+            gcc_future.result()
+            gdb_future.result()
+    else:
+        build_gcc(install, nb_jobs, obj_directory, prefix, gcc_directory,
+                  target, enable_cxx, config_cache, env)
+
+    with open(stamp, 'w') as stamp_file:
+        stamp_file.write(stamp_key)
+
+    if clean:
+        logger.info('>>> Cleaning up')
+        cleanup_dir(work_directory)
 
-    os.chdir(BASEDIR)
-    logger.info('>>> Cleaning up')
-    cleanup_dir(work_directory)
+
+def build_all_targets(install, nb_cores, enable_cxx, enable_gdb, clean, jobs):
+    """Cross-compile the gcc toolchain for every supported architecture.
+
+    Platforms are dispatched longest gcc build first, based on the
+    durations recorded in timings.json by previous runs, so the slowest
+    target does not end up last on an otherwise idle machine.
+    """
+    try:
+        with open(TIMINGS_FILE) as timings_file:
+            timings = json.load(timings_file)
+    except (OSError, ValueError):
+        timings = {}
+
+    def gcc_build_time(platform):
+        return timings.get(f'{TARGETS[platform]}/gcc-make', 0.0)
+
+    platforms = sorted(TARGETS, key=gcc_build_time, reverse=True)
+    nb_jobs = max(1, nb_cores // jobs)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(build_target, platform, install, nb_jobs,
+                                   enable_cxx, enable_gdb, clean)
+                   for platform in platforms]
+
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
 
 
 if __name__ == '__main__':
@@ -447,10 +847,16 @@ if __name__ == '__main__':
     parser.add_argument('-a', '--arch',
                         help='Target architecture',
                         type=str,
-                        choices=['aarch64', 'amd64', 'arm32', 'armhf', 'ia32', 'ia64',
-                                 'mips32', 'mips32eb', 'mips64', 'ppc32',
-                                 'ppc64', 'sparc32', 'sparc64', 'lm32'],
-                        required=True)
+                        choices=sorted(TARGETS))
+    parser.add_argument('--all-targets',
+                        help='Build cross-compilers for every supported '
+                        'architecture',
+                        action='store_true')
+    parser.add_argument('--jobs',
+                        help='Number of architectures to build concurrently '
+                        'with --all-targets',
+                        type=int,
+                        default=1)
     parser.add_argument('-i', '--install',
                         help='Install in /usr/local/cross or just '
                         'keep cross-compiled binaries into the build directory',
@@ -460,17 +866,44 @@ if __name__ == '__main__':
     parser.add_argument('--enable-cxx',
                         help='Build tools for C++ (g++, etc.)',
                         action='store_true')
+    parser.add_argument('--enable-gdb',
+                        help='Also build the GDB debugger',
+                        action='store_true')
+    parser.add_argument('--cores',
+                        help='Number of parallel make jobs '
+                        '(defaults to all available cpu cores)',
+                        type=int,
+                        default=len(os.sched_getaffinity(0)))
+    parser.add_argument('--clean',
+                        help='Remove unpacked sources from a previous run '
+                        'instead of reusing them',
+                        action='store_true')
 
     arguments = parser.parse_args()
 
+    if not arguments.all_targets and arguments.arch is None:
+        parser.error('either --arch or --all-targets is required')
+
     target_platform = arguments.arch
     install = arguments.install == 'yes'
-    nb_cpu_cores = len(os.sched_getaffinity(0)) # Get currently available cpu cores
+    nb_cpu_cores = max(1, arguments.cores)
     enable_cxx=arguments.enable_cxx
 
     check_headers()
     prepare()
-    build_target(target_platform, install, nb_cpu_cores, enable_cxx)
+
+    try:
+        if arguments.all_targets:
+            build_all_targets(install, nb_cpu_cores, enable_cxx,
+                              arguments.enable_gdb, arguments.clean,
+                              max(1, arguments.jobs))
+        else:
+            build_target(target_platform, install, nb_cpu_cores, enable_cxx,
+                         arguments.enable_gdb, arguments.clean)
+    except RuntimeError as error:
+        logger.error(f'Error: {error}')
+        sys.exit(1)
 
     msg = 'installed' if arguments.install == 'yes' else 'built'
-    logger.info(f'>>> Cross-compiler for {target_platform} is now {msg}.')
+    built = 'all targets' if arguments.all_targets else target_platform
+    logger.info(f'>>> Cross-compiler for {built} is now {msg}.')